@@ -0,0 +1,83 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled fast path for get_top_words.parse_ngram_line.
+
+Only handles the common case: a raw line with an ASCII word and a
+match_count field of plain decimal digits. Anything else returns None so the
+caller falls back to the Python parser, which keeps results identical.
+
+Built on import by pyximport when Cython is installed.
+"""
+
+cdef enum:
+    # Maximum digits parsed without risking long long overflow
+    MAX_DIGITS = 18
+
+
+cdef inline bint is_space(unsigned char c):
+    # ASCII characters that str.strip() removes
+    return c == 32 or (9 <= c <= 13) or (28 <= c <= 31)
+
+
+cpdef object parse_line(bytes line, object normalize_pos):
+    """
+    Parse a Google Books Ngram 1-gram line.
+    Returns (word, match_count, pos_mask) like parse_ngram_line, with the
+    word as lowercase bytes, or None when the line needs the Python parser.
+    """
+    cdef const unsigned char* buf = line
+    cdef Py_ssize_t start = 0, end = len(line)
+    cdef Py_ssize_t tab1 = -1, tab2 = -1, tab3 = -1, underscore = -1
+    cdef Py_ssize_t i
+    cdef unsigned char c
+    cdef long long count = 0
+    cdef bint has_upper = False
+
+    # Equivalent of line.strip() without allocating
+    while start < end and is_space(buf[start]):
+        start += 1
+    while end > start and is_space(buf[end - 1]):
+        end -= 1
+
+    # Locate the first three tab separators, checking the word as we go
+    for i in range(start, end):
+        c = buf[i]
+        if c == 9:
+            if tab1 < 0:
+                tab1 = i
+            elif tab2 < 0:
+                tab2 = i
+            else:
+                tab3 = i
+                break
+        elif tab1 < 0:
+            if c >= 128:
+                # Non-ASCII word: needs UTF-8 decoding
+                return None
+            if 65 <= c <= 90:
+                has_upper = True
+            elif c == 95 and underscore < 0:
+                underscore = i
+    if tab2 < 0:
+        return None
+    if tab3 < 0:
+        tab3 = end
+
+    # match_count: plain digits only; signs, spaces etc. go to the Python parser
+    if tab3 == tab2 + 1 or tab3 - tab2 - 1 > MAX_DIGITS:
+        return None
+    for i in range(tab2 + 1, tab3):
+        c = buf[i]
+        if not (48 <= c <= 57):
+            return None
+        count = count * 10 + (c - 48)
+
+    pos_mask = 0
+    if underscore >= 0:
+        word = line[start:underscore]
+        pos_mask = normalize_pos(line[underscore + 1:tab1].lower().decode('ascii'))
+    else:
+        word = line[start:tab1]
+    if has_upper:
+        word = word.lower()
+    return word, count, pos_mask
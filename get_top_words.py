@@ -10,118 +10,309 @@ Supports multiple data sources:
 2. Google Books Ngram 1-gram files
 3. CSV frequency files
 
+Ngram files are parsed line by line, using the compiled _ngram_parse
+extension when Cython is available.
+
 Data source: https://www.wordfrequency.info/samples.asp
 """
 
 import sys
+import io
 import gzip
-from collections import defaultdict
+import heapq
+import shutil
+import contextlib
+import functools
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from urllib.request import urlopen
 import tempfile
 import os
 import re
 
+# Build directory for the compiled ngram parser, and where a failed build is recorded
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'glossia')
+
+@functools.lru_cache(maxsize=None)
+def _load_fast_parser():
+    """
+    Import the optional compiled parser (_ngram_parse.pyx), building it with
+    pyximport on first use. Returns its parse_line, or None when Cython is
+    not installed or the build fails. A failed build is recorded in CACHE_DIR
+    and not retried until the .pyx file changes.
+    """
+    pyx_dir = os.path.dirname(os.path.abspath(__file__))
+    pyx_path = os.path.join(pyx_dir, '_ngram_parse.pyx')
+    failed_path = os.path.join(CACHE_DIR, '_ngram_parse.failed')
+    try:
+        pyx_stamp = str(os.stat(pyx_path).st_mtime_ns)
+    except OSError:
+        return None
+    try:
+        with open(failed_path, encoding='utf-8') as f:
+            if f.read() == pyx_stamp:
+                return None
+    except OSError:
+        pass
+    
+    try:
+        import pyximport
+    except ImportError:
+        return None
+    
+    # Only hook .pyx imports, and only look next to this script, for this one import
+    importers = pyximport.install(language_level=3, build_dir=os.path.join(CACHE_DIR, 'pyxbld'))
+    sys.path.insert(0, pyx_dir)
+    try:
+        from _ngram_parse import parse_line
+        return parse_line
+    except ModuleNotFoundError:
+        return None
+    except ImportError:  # pyximport reports build and compile errors as ImportError
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(failed_path, 'w', encoding='utf-8') as f:
+                f.write(pyx_stamp)
+        except OSError:
+            pass
+        return None
+    finally:
+        sys.path.remove(pyx_dir)
+        pyximport.uninstall(*importers)
+
+# Read buffer size for decompressed input (matches CPython's gzip module)
+READ_BUFFER_SIZE = 128 * 1024
+
+# Block size for the line-by-line ngram parser
+NGRAM_BLOCK_SIZE = 1 << 20
+
+# With --low-memory, prune once more than PRUNE_FACTOR * top_n words are held
+PRUNE_FACTOR = 4
+
+# Characters str.strip() removes from ASCII text
+_ASCII_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+# Part-of-speech patterns fused into a single regex so normalize_pos scans each
+# string once. Every alternative is a zero-width lookahead, so overlapping hits
+# (e.g. "adverb" also containing "verb") are still reported at their own offsets.
+_POS_PATTERNS = (
+    ('N', r'\bn\.?\b|noun'),
+    ('V', r'\bv\.?\s*(?:t\.?|i\.?)?\b|verb'),
+    ('Adj', r'\ba\.?\b|\badj\.?\b|adjective'),
+    ('Adv', r'\badv\.?\b|adverb'),
+    ('Prep', r'\bprep\.?\b|preposition'),
+    ('Conj', r'\bconj\.?\b|conjunction'),
+    ('Pron', r'\bpron\.?\b|pronoun'),
+    ('Det', r'def\. art\.|definite article|det\.'),
+)
+_POS_RE = re.compile('|'.join(f'(?=(?P<{tag}>{pat}))' for tag, pat in _POS_PATTERNS))
+
+# A word's POS tags are stored as a bitmask of these values
+_POS_BIT = {'N': 1, 'V': 2, 'Adj': 4, 'Adv': 8, 'Prep': 16, 'Conj': 32, 'Pron': 64, 'Det': 128}
+
+# Sorted tag tuple for every possible mask, so decoding is a table lookup
+_POS_TAGS_BY_MASK = tuple(
+    tuple(sorted(tag for tag, bit in _POS_BIT.items() if mask & bit))
+    for mask in range(1 << len(_POS_BIT))
+)
+
+@functools.lru_cache(maxsize=None)
 def normalize_pos(pos_str):
     """
     Convert POS values to simplified format used in cover_POS.txt
-    Returns a set of normalized POS tags.
+    Returns a bitmask of normalized POS tags (see _POS_BIT).
+    
+    POS strings come from a small vocabulary, so results are cached.
     """
     if not pos_str:
-        return set()
+        return 0
     
     pos_str = pos_str.strip().lower()
-    pos_tags = set()
+    pos_mask = 0
     
     # Map to simplified POS tags
-    # Noun
-    if re.search(r'\bn\.?\b', pos_str) or 'noun' in pos_str:
-        pos_tags.add('N')
+    for match in _POS_RE.finditer(pos_str):
+        pos_mask |= _POS_BIT[match.lastgroup]
     
-    # Verb (transitive, intransitive, or general)
-    if re.search(r'\bv\.?\s*(t\.?|i\.?)?\b', pos_str) or 'verb' in pos_str:
-        pos_tags.add('V')
-    
-    # Adjective
-    if re.search(r'\ba\.?\b', pos_str) or re.search(r'\badj\.?\b', pos_str) or 'adjective' in pos_str:
-        pos_tags.add('Adj')
-    
-    # Adverb
-    if re.search(r'\badv\.?\b', pos_str) or 'adverb' in pos_str:
-        pos_tags.add('Adv')
-    
-    # Preposition
-    if re.search(r'\bprep\.?\b', pos_str) or 'preposition' in pos_str:
-        pos_tags.add('Prep')
-    
-    # Conjunction
-    if re.search(r'\bconj\.?\b', pos_str) or 'conjunction' in pos_str:
-        pos_tags.add('Conj')
-    
-    # Pronoun
-    if re.search(r'\bpron\.?\b', pos_str) or 'pronoun' in pos_str:
-        pos_tags.add('Pron')
-    
-    # Determiner (definite article, etc.)
-    if 'def. art.' in pos_str or 'definite article' in pos_str or 'det.' in pos_str:
-        pos_tags.add('Det')
-    
-    return pos_tags
+    return pos_mask
+
+def pos_mask_to_tags(pos_mask):
+    """Return the sorted POS tags encoded in a normalize_pos bitmask"""
+    return _POS_TAGS_BY_MASK[pos_mask]
+
+def format_word_line(word, pos_mask):
+    """Format a word and its POS tags as a cover_POS.txt line"""
+    pos_tags = pos_mask_to_tags(pos_mask)
+    if pos_tags:
+        return f"{word}|{','.join(pos_tags)}\n"
+    # Output word without POS if no tags available
+    return f"{word}\n"
 
 def parse_ngram_line(line):
     """
-    Parse a line from Google Books Ngram 1-gram file.
+    Parse a raw (bytes) line from Google Books Ngram 1-gram file.
     Format: word TAB year TAB match_count TAB page_count TAB volume_count
-    Returns: (word, match_count, pos_tags)
+    Returns: (word, match_count, pos_mask)
+    
+    ASCII lines (nearly all of them) are parsed without decoding. ASCII words
+    are returned as bytes and any other word as str.
     """
-    parts = line.strip().split('\t')
+    if line.isascii():
+        parts = line.strip(_ASCII_WHITESPACE).split(b'\t')
+        sep = b'_'
+    else:
+        parts = line.decode('utf-8', errors='ignore').strip().split('\t')
+        sep = '_'
     if len(parts) >= 3:
         word = parts[0].lower()
-        pos_tags = set()
+        pos_mask = 0
         
         # Extract POS tags if present (word_POS format)
-        if '_' in word:
-            word_part, pos_part = word.split('_', 1)
+        if sep in word:
+            word_part, pos_part = word.split(sep, 1)
             word = word_part
-            pos_tags = normalize_pos(pos_part)
+            if sep == b'_':
+                pos_part = pos_part.decode('ascii')
+            pos_mask = normalize_pos(pos_part)
         
         try:
             match_count = int(parts[2])
-            return word, match_count, pos_tags
+            # Keep ASCII words as bytes whichever branch parsed them, so each
+            # word has a single key
+            if sep == '_' and word.isascii():
+                word = word.encode('ascii')
+            return word, match_count, pos_mask
         except (ValueError, IndexError):
             pass
-    return None, 0, set()
+    return None, 0, 0
+
+@functools.lru_cache(maxsize=None)
+def _ngram_line_parser():
+    """
+    Return the function process_ngram_file parses lines with: the compiled
+    parser when it loads (falling back to parse_ngram_line for the lines it
+    leaves), else parse_ngram_line. Loaded on first use, not at import.
+    """
+    parse_fast = _load_fast_parser()
+    if parse_fast is None:
+        return parse_ngram_line
+    
+    def parse_line(line):
+        return parse_fast(line, normalize_pos) or parse_ngram_line(line)
+    return parse_line
+
+def _decode_word(word):
+    """Decode a word returned by parse_ngram_line to str"""
+    return word.decode('ascii') if type(word) is bytes else word
+
+def _iter_line_blocks(f):
+    """
+    Read binary file f in NGRAM_BLOCK_SIZE blocks and yield each block as a
+    list of raw lines, splitting with bytes.split instead of iterating line
+    objects. As in text mode, CR and CRLF also end a line.
+    """
+    leftover = b''
+    while True:
+        block = f.read(NGRAM_BLOCK_SIZE)
+        if not block:
+            break
+        block = leftover + block
+        if b'\r' in block:
+            block = block.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        lines = block.split(b'\n')
+        leftover = lines.pop()
+        yield lines
+    if leftover:
+        yield [leftover]
+
+@contextlib.contextmanager
+def _open_binary(file_path):
+    """
+    Open a plain or gzipped file for reading as bytes.
+    .gz files are decompressed by an external pigz/zcat process when one is
+    on PATH, which runs on another core; otherwise gzip.open is used.
+    All paths read through READ_BUFFER_SIZE buffers.
+    """
+    if not file_path.endswith('.gz'):
+        with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+            yield f
+        return
+    
+    decompressor = shutil.which('pigz') or shutil.which('zcat')
+    if not decompressor:
+        with io.BufferedReader(gzip.open(file_path, 'rb'), buffer_size=READ_BUFFER_SIZE) as f:
+            yield f
+        return
+    
+    cmd = [decompressor, '-dc', file_path]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=READ_BUFFER_SIZE)
+    f = proc.stdout
+    try:
+        yield f
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        f.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise OSError(f"{decompressor} exited with status {proc.returncode}")
 
-def process_ngram_file(file_path):
+def prune_word_counts(freqs, pos_masks, top_n, keep=None):
+    """
+    Drop words whose frequency is below the current top_n-th highest.
+    The word keep (the one still being read) is never dropped.
+    Returns the pruned (freqs, pos_masks).
+    """
+    threshold = heapq.nlargest(top_n, freqs.values())[-1]
+    freqs = {w: f for w, f in freqs.items() if f >= threshold or w == keep}
+    pos_masks = {w: m for w, m in pos_masks.items() if w in freqs}
+    return freqs, pos_masks
+
+def process_ngram_file(file_path, prune_to=None):
     """
     Process a Google Books Ngram 1-gram file.
     Aggregates frequencies across all years for each word.
-    Returns dictionary of word -> (total_frequency, pos_tags_set)
-    """
-    word_data = defaultdict(lambda: {'freq': 0, 'pos': set()})
+    Returns (freqs, pos_masks): word -> total frequency and word -> POS bitmask.
+    Words without POS tags have no pos_masks entry.
     
-    # Determine if file is gzipped
-    open_func = gzip.open if file_path.endswith('.gz') else open
-    mode = 'rt' if file_path.endswith('.gz') else 'r'
+    If prune_to is set, memory is bounded by periodically dropping words
+    below the running prune_to-th highest frequency. Ngram files list each
+    word's lines together, so this is exact for most words, but a word whose
+    lines are spread through the file (e.g. case variants) can be dropped
+    before its total is known.
+    """
+    freqs = {}
+    pos_masks = {}
+    parse_line = _ngram_line_parser()
     
     try:
         print(f"Processing {file_path}...", file=sys.stderr)
-        with open_func(file_path, mode, encoding='utf-8', errors='ignore') as f:
+        with _open_binary(file_path) as f:
             line_count = 0
-            for line in f:
-                word, freq, pos_tags = parse_ngram_line(line)
-                if word and len(word) <= 6 and word.isalpha():
-                    word_data[word]['freq'] += freq
-                    word_data[word]['pos'].update(pos_tags)
-                
-                line_count += 1
-                if line_count % 1000000 == 0:
-                    print(f"  Processed {line_count:,} lines...", file=sys.stderr)
+            for lines in _iter_line_blocks(f):
+                for line in lines:
+                    word, freq, pos_mask = parse_line(line)
+                    if word and len(word) <= 6 and word.isalpha():
+                        freqs[word] = freqs.get(word, 0) + freq
+                        if pos_mask:
+                            pos_masks[word] = pos_masks.get(word, 0) | pos_mask
+                    
+                    line_count += 1
+                    if line_count % 1000000 == 0:
+                        print(f"  Processed {line_count:,} lines...", file=sys.stderr)
+                        if prune_to and len(freqs) > PRUNE_FACTOR * prune_to:
+                            freqs, pos_masks = prune_word_counts(freqs, pos_masks, prune_to, keep=word)
+            
+            # ASCII words were kept as bytes; decode once per unique word
+            freqs = {_decode_word(w): f for w, f in freqs.items()}
+            pos_masks = {_decode_word(w): m for w, m in pos_masks.items()}
         
-        print(f"Found {len(word_data):,} unique words with 6 or fewer characters", file=sys.stderr)
-        return word_data
+        print(f"Found {len(freqs):,} unique words with 6 or fewer characters", file=sys.stderr)
+        return freqs, pos_masks
     except Exception as e:
         print(f"Error processing file {file_path}: {e}", file=sys.stderr)
-        return {}
+        return {}, {}
 
 def download_wordfrequency_data():
     """
@@ -152,7 +343,7 @@ def parse_wordfrequency_line(line):
     """
     Parse a line from wordfrequency.info lemmas file.
     Format appears to be tab or pipe separated with: rank, lemma, pos, frequency data, etc.
-    Returns: (word, freq, pos_tags)
+    Returns: (word, freq, pos_mask)
     """
     # Try different separators
     for sep in ['\t', '|', ',']:
@@ -181,18 +372,18 @@ def parse_wordfrequency_line(line):
                             continue
                     
                     if word and freq is not None:
-                        pos_tags = normalize_pos(pos_str)
-                        return word, freq, pos_tags
+                        return word, freq, normalize_pos(pos_str)
                 except (ValueError, IndexError):
                     continue
-    return None, None, set()
+    return None, None, 0
 
 def get_top_words_from_wordfrequency(file_path, top_n=1000):
     """
     Get top words from wordfrequency.info format file.
-    Returns dictionary of word -> {'freq': frequency, 'pos': set_of_pos_tags}
+    Returns (freqs, pos_masks): word -> frequency and word -> POS bitmask.
     """
-    word_data = {}
+    freqs = {}
+    pos_masks = {}
     
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -204,31 +395,29 @@ def get_top_words_from_wordfrequency(file_path, top_n=1000):
                         header_skipped = True
                         continue
                 
-                word, freq, pos_tags = parse_wordfrequency_line(line)
+                word, freq, pos_mask = parse_wordfrequency_line(line)
                 if word and freq is not None and len(word) <= 6 and word.isalpha():
                     # Keep highest frequency if word appears multiple times, merge POS tags
-                    if word not in word_data:
-                        word_data[word] = {'freq': freq, 'pos': pos_tags}
-                    else:
-                        if freq > word_data[word]['freq']:
-                            word_data[word]['freq'] = freq
-                        word_data[word]['pos'].update(pos_tags)
+                    if word not in freqs or freq > freqs[word]:
+                        freqs[word] = freq
+                    if pos_mask:
+                        pos_masks[word] = pos_masks.get(word, 0) | pos_mask
     except FileNotFoundError:
         print(f"File not found: {file_path}", file=sys.stderr)
-        return {}
+        return {}, {}
     except Exception as e:
         print(f"Error reading {file_path}: {e}", file=sys.stderr)
-        return {}
+        return {}, {}
     
-    return word_data
+    return freqs, pos_masks
 
 def get_top_words_from_csv(csv_file, top_n=1000):
     """
     Get top words from a CSV frequency file.
     Expected format: word,frequency or word,frequency,...
-    Returns dictionary of word -> {'freq': frequency, 'pos': set()}
+    Returns (freqs, pos_masks); CSV files carry no POS tags, so pos_masks is empty.
     """
-    word_data = {}
+    freqs = {}
     
     try:
         with open(csv_file, 'r', encoding='utf-8') as f:
@@ -245,20 +434,18 @@ def get_top_words_from_csv(csv_file, top_n=1000):
                         freq = float(parts[1].strip())
                         if word and len(word) <= 6 and word.isalpha():
                             # Keep highest frequency if word appears multiple times
-                            if word not in word_data:
-                                word_data[word] = {'freq': freq, 'pos': set()}
-                            elif freq > word_data[word]['freq']:
-                                word_data[word]['freq'] = freq
+                            if word not in freqs or freq > freqs[word]:
+                                freqs[word] = freq
                     except ValueError:
                         continue
     except FileNotFoundError:
         print(f"File not found: {csv_file}", file=sys.stderr)
-        return {}
+        return {}, {}
     except Exception as e:
         print(f"Error reading {csv_file}: {e}", file=sys.stderr)
-        return {}
+        return {}, {}
     
-    return word_data
+    return freqs, {}
 
 if __name__ == "__main__":
     import argparse
@@ -300,29 +487,42 @@ Data sources:
                         help='Path to wordfrequency.info format file (lemmas_60k.txt format)')
     parser.add_argument('--download-coca', action='store_true',
                         help='Download free COCA word frequency data from wordfrequency.info')
+    parser.add_argument('--low-memory', action='store_true',
+                        help='With --ngram, periodically drop words outside the running top N '
+                             'to bound memory (approximate for words spread through a file)')
     
     args = parser.parse_args()
     
-    word_data = {}
+    freqs, pos_masks = {}, {}
     
     if args.ngram:
         # Process Google Books Ngram file(s)
-        all_word_data = {}
+        existing_files = []
         for ngram_file in args.ngram:
             if not os.path.exists(ngram_file):
                 print(f"Error: File not found: {ngram_file}", file=sys.stderr)
                 continue
-            
-            file_data = process_ngram_file(ngram_file)
+            existing_files.append(ngram_file)
+        
+        process = functools.partial(process_ngram_file,
+                                    prune_to=args.top_n if args.low_memory else None)
+        
+        # Files are independent, so process them in parallel worker processes
+        if len(existing_files) > 1:
+            max_workers = min(len(existing_files), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(process, existing_files))
+        else:
+            results = [process(f) for f in existing_files]
+        
+        for file_freqs, file_pos_masks in results:
             # Merge data (sum frequencies, merge POS tags)
-            for word, data in file_data.items():
-                if word not in all_word_data:
-                    all_word_data[word] = {'freq': 0, 'pos': set()}
-                all_word_data[word]['freq'] += data['freq']
-                all_word_data[word]['pos'].update(data['pos'])
+            for word, freq in file_freqs.items():
+                freqs[word] = freqs.get(word, 0) + freq
+            for word, pos_mask in file_pos_masks.items():
+                pos_masks[word] = pos_masks.get(word, 0) | pos_mask
         
-        word_data = all_word_data
-        if not word_data:
+        if not freqs:
             print("No words found in Ngram files.", file=sys.stderr)
             sys.exit(1)
             
@@ -330,7 +530,7 @@ Data sources:
         # Download COCA word frequency data
         temp_file = download_wordfrequency_data()
         if temp_file:
-            word_data = get_top_words_from_wordfrequency(temp_file, args.top_n * 2)
+            freqs, pos_masks = get_top_words_from_wordfrequency(temp_file, args.top_n * 2)
             # Clean up temp file
             try:
                 os.unlink(temp_file)
@@ -343,46 +543,37 @@ Data sources:
     elif args.wordfreq:
         # Use wordfrequency.info format file
         print(f"Reading wordfrequency.info file: {args.wordfreq}", file=sys.stderr)
-        word_data = get_top_words_from_wordfrequency(args.wordfreq, args.top_n)
+        freqs, pos_masks = get_top_words_from_wordfrequency(args.wordfreq, args.top_n)
         
     elif args.csv:
         # Use CSV frequency file
         print(f"Reading CSV file: {args.csv}", file=sys.stderr)
-        word_data = get_top_words_from_csv(args.csv, args.top_n)
+        freqs, pos_masks = get_top_words_from_csv(args.csv, args.top_n)
     else:
         parser.print_help()
         print("\nError: Must specify one of: --download-coca, --wordfreq, --csv, or --ngram", file=sys.stderr)
         sys.exit(1)
     
-    if not word_data:
+    if not freqs:
         print("No words found. Check your input files.", file=sys.stderr)
         sys.exit(1)
     
-    # Filter for words with 6 or fewer characters, no punctuation
-    filtered = {w: d for w, d in word_data.items() 
-                if len(w) <= 6 and w.isalpha()}
-    
-    # Sort by frequency (descending) and get top N
-    sorted_words = sorted(filtered.items(), key=lambda x: x[1]['freq'], reverse=True)[:args.top_n]
+    # Select top N by frequency (descending) without sorting every word.
+    # Every reader already keeps only words with 6 or fewer letters.
+    sorted_words = heapq.nlargest(args.top_n, freqs.items(), key=lambda x: x[1])
     
     # Output results in cover_POS.txt format
     output_file = open(args.output, 'w') if args.output else sys.stdout
     
-    for word, data in sorted_words:
-        pos_tags = sorted(data['pos'])
-        if pos_tags:
-            pos_str = ','.join(pos_tags)
-            output_file.write(f"{word}|{pos_str}\n")
-        else:
-            # Output word without POS if no tags available
-            output_file.write(f"{word}\n")
+    output_file.writelines(format_word_line(word, pos_masks.get(word, 0))
+                           for word, _ in sorted_words)
     
     if args.output:
         output_file.close()
         print(f"\nTop {len(sorted_words)} words saved to {args.output}", file=sys.stderr)
-        words_with_pos = sum(1 for _, d in sorted_words if d['pos'])
+        words_with_pos = sum(1 for w, _ in sorted_words if pos_masks.get(w))
         print(f"Words with POS tags: {words_with_pos}/{len(sorted_words)}", file=sys.stderr)
         if sorted_words:
-            print(f"Frequency range: {sorted_words[-1][1]['freq']:,.0f} to {sorted_words[0][1]['freq']:,.0f}", file=sys.stderr)
+            print(f"Frequency range: {sorted_words[-1][1]:,.0f} to {sorted_words[0][1]:,.0f}", file=sys.stderr)
     else:
         print(f"\nTotal words: {len(sorted_words)}", file=sys.stderr)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Generate payload_data.py from payload.yaml.
+
+The generated module holds the parsed YAML as Python literals, so loading it
+is an import from the cached bytecode instead of a YAML parse:
+    WORDS        - the top-level word keys in file order, duplicates included
+    DATA         - the parsed YAML mapping
+    SOURCE_STAMP - (st_mtime_ns, st_size) of the YAML file it was built from
+"""
+
+import os
+import sys
+import mmap
+import yaml
+import py_compile
+import importlib.util
+from pathlib import Path
+
+# Prefer the libyaml C loader
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+class _PayloadLoader(_Loader):
+    """
+    Loader that keeps top-level keys like false, off, true and on as strings
+    (so every word key is a str) and records them in file order. Values still
+    resolve as usual, so a weight written as yes still loads as True.
+    """
+    
+    def construct_document(self, node):
+        # The mapping merges duplicate keys, so record them from the node
+        if isinstance(node, yaml.MappingNode):
+            self.word_keys = []
+            for key_node, _ in node.value:
+                if key_node.tag == 'tag:yaml.org,2002:bool':
+                    key_node.tag = 'tag:yaml.org,2002:str'
+                self.word_keys.append(key_node.value)
+        return super().construct_document(node)
+
+def load_payload_yaml(yaml_file_path):
+    """Parse a payload YAML file, returning (words, data)"""
+    # Map the file so the loader reads bytes straight from the page cache
+    # instead of decoding it to str first (mmap rejects empty files)
+    with open(yaml_file_path, 'rb') as f:
+        mm = None
+        if os.fstat(f.fileno()).st_size:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        loader = _PayloadLoader(mm if mm is not None else f)
+        try:
+            data = loader.get_single_data()
+        finally:
+            loader.dispose()
+            if mm is not None:
+                mm.close()
+    return getattr(loader, 'word_keys', []), data
+
+def payload_module_path(yaml_file_path):
+    """Path of the module generated for a payload YAML file (payload_data.py)"""
+    yaml_path = Path(yaml_file_path)
+    return yaml_path.with_name(yaml_path.stem + '_data.py')
+
+def yaml_stamp(yaml_file_path):
+    """(st_mtime_ns, st_size) of a payload YAML file"""
+    st = os.stat(yaml_file_path)
+    return (st.st_mtime_ns, st.st_size)
+
+def load_payload_module(yaml_file_path, stamp):
+    """
+    Import the generated module for a YAML file and return (words, data).
+    Returns None when the module is missing, older than this script, or was
+    built from a YAML file with a different stamp (see yaml_stamp); a newer
+    module mtime alone is not trusted, since tools like cp -p, tar and
+    rsync -t can restore an older YAML file with its old mtime.
+    """
+    module_path = payload_module_path(yaml_file_path)
+    try:
+        if module_path.stat().st_mtime_ns <= Path(__file__).stat().st_mtime_ns:
+            return None
+    except OSError:
+        return None
+    
+    spec = importlib.util.spec_from_file_location(module_path.stem, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if getattr(module, 'SOURCE_STAMP', None) != tuple(stamp):
+        return None
+    return module.WORDS, module.DATA
+
+def write_payload_module(words, data, stamp, module_path):
+    """
+    Write WORDS, DATA and SOURCE_STAMP (the yaml_stamp taken before the YAML
+    was read) as a Python module and byte-compile it
+    """
+    # Write to a per-process temporary file first so a failed run never leaves
+    # a truncated module behind and concurrent runs never share one; the
+    # temporary file is removed if writing fails
+    tmp_path = Path(module_path).with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f"# Generated by {Path(__file__).name}; do not edit.\n")
+            # repr() writes non-finite floats as inf/nan
+            f.write("from math import inf, nan\n\n")
+            f.write(f"SOURCE_STAMP = {tuple(stamp)!r}\n\n")
+            f.write(f"WORDS = {words!r}\n\n")
+            f.write(f"DATA = {data!r}\n")
+        os.replace(tmp_path, module_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    
+    # Hash-checked bytecode stays valid even if the module is regenerated
+    # within the same second at the same size
+    py_compile.compile(
+        str(module_path),
+        cfile=importlib.util.cache_from_source(str(module_path)),
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+    )
+
+def build_payload_py(yaml_file_path):
+    """Regenerate the payload module for a YAML file, returning (words, data)"""
+    # Stamp before reading, so a YAML file changed mid-read looks stale next time
+    stamp = yaml_stamp(yaml_file_path)
+    words, data = load_payload_yaml(yaml_file_path)
+    write_payload_module(words, data, stamp, payload_module_path(yaml_file_path))
+    return words, data
+
+if __name__ == '__main__':
+    script_dir = Path(__file__).parent
+    yaml_file = Path(sys.argv[1]) if len(sys.argv) > 1 else script_dir / 'payload.yaml'
+    
+    words, _ = build_payload_py(yaml_file)
+    print(f"Wrote {len(words)} entries to {payload_module_path(yaml_file)}")
@@ -1,31 +1,31 @@
 #!/usr/bin/env python3
 """Generate YAML entries for cover.yaml from cover_POS.txt"""
 
+# Weights for 1-5 POS tags, indexed by tag count; the first tag is usually
+# the most common, so it gets the largest share
+_WEIGHT_TABLE = (
+    None,
+    (1.0,),
+    (0.6, 0.4),
+    (0.5, 0.3, 0.2),
+    (0.4, 0.3, 0.2, 0.1),
+    (0.35, 0.25, 0.2, 0.1, 0.1),
+)
+
 def assign_weights(pos_tags):
     """Assign weights to POS tags that sum to 1.0"""
     pos_list = [tag.strip() for tag in pos_tags.split(',')]
     num_tags = len(pos_list)
     
-    if num_tags == 1:
-        return {pos_list[0]: 1.0}
-    elif num_tags == 2:
-        # Common pattern: first tag is usually more common
-        return {pos_list[0]: 0.6, pos_list[1]: 0.4}
-    elif num_tags == 3:
-        return {pos_list[0]: 0.5, pos_list[1]: 0.3, pos_list[2]: 0.2}
-    elif num_tags == 4:
-        return {pos_list[0]: 0.4, pos_list[1]: 0.3, pos_list[2]: 0.2, pos_list[3]: 0.1}
-    elif num_tags == 5:
-        return {pos_list[0]: 0.35, pos_list[1]: 0.25, pos_list[2]: 0.2, pos_list[3]: 0.1, pos_list[4]: 0.1}
+    if num_tags < len(_WEIGHT_TABLE):
+        weights = _WEIGHT_TABLE[num_tags]
     else:
         # Equal distribution for 6+ tags
-        weight = 1.0 / num_tags
-        return {pos: weight for pos in pos_list}
+        weights = (1.0 / num_tags,) * num_tags
+    return dict(zip(pos_list, weights))
 
 def generate_yaml_entries(pos_file_path, start_line=10):
-    """Generate YAML entries from POS file starting at specified line"""
-    entries = []
-    
+    """Yield YAML entries from POS file starting at specified line"""
     with open(pos_file_path, 'r', encoding='utf-8') as f:
         lines = f.readlines()
     
@@ -47,14 +47,8 @@ def generate_yaml_entries(pos_file_path, start_line=10):
         weights = assign_weights(pos_tags)
         
         # Format YAML entry
-        entry = f"{word}:"
-        for pos, weight in sorted(weights.items()):
-            entry += f"\n  {pos}: {weight}"
-        entry += "\n"
-        
-        entries.append(entry)
-    
-    return entries
+        yaml_lines = [f"{word}:"] + [f"  {pos}: {weight}" for pos, weight in sorted(weights.items())]
+        yield '\n'.join(yaml_lines) + '\n'
 
 if __name__ == '__main__':
     import sys
@@ -64,11 +58,9 @@ if __name__ == '__main__':
     pos_file = script_dir / 'cover_POS.txt'
     output_file = script_dir / 'cover.yaml'
     
-    entries = generate_yaml_entries(pos_file, start_line=10)
-    
-    # Append to existing cover.yaml
+    # Append to existing cover.yaml, with a blank line before each entry
+    entries = list(generate_yaml_entries(pos_file, start_line=10))
     with open(output_file, 'a', encoding='utf-8') as f:
-        f.write('\n')
-        f.write('\n'.join(entries))
+        f.writelines('\n' + entry for entry in entries)
     
     print(f"Appended {len(entries)} YAML entries to {output_file}")
@@ -4,8 +4,17 @@
 import sys
 import yaml
 import re
+from math import fsum
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Word definition lines (word: or word::), possibly indented
+_KEY_RE = re.compile(r'^\s*([a-z:]+):\s*$', re.MULTILINE)
+
 def check_weights_sum_to_one(yaml_file_path):
     """Check that all weights for each word sum to 1.0"""
     words_with_invalid_sums = []
@@ -17,14 +26,13 @@ def check_weights_sum_to_one(yaml_file_path):
     
     # Extract all word keys from raw file
     word_keys = []
-    pattern = r'^(\s*)([a-z:]+):\s*$'
-    for match in re.finditer(pattern, content, re.MULTILINE):
-        word = match.group(2)
+    for match in _KEY_RE.finditer(content):
+        word = match.group(1)
         word_keys.append(word)
     
     # Load YAML data
     with open(yaml_file_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_Loader)
     
     if data is None:
         return {}, []
@@ -43,8 +51,9 @@ def check_weights_sum_to_one(yaml_file_path):
         
         word_weights[word] = weights
         
-        # Check if weights sum to 1.0
-        total = sum(weights.values())
+        # Check if weights sum to 1.0 (fsum rounds only the final total, so the
+        # error does not grow with the number of weights)
+        total = fsum(weights.values())
         if abs(total - 1.0) > tolerance:
             words_with_invalid_sums.append((word, total))
     
@@ -6,11 +6,28 @@ Script to verify that:
 3. All weights for each word sum to 1.0
 """
 
+import os
 import sys
 import re
 import yaml
+import pickle
+import hashlib
+import argparse
+from math import fsum
+from collections import Counter
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Parsed inputs are cached here between runs
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'glossia'
+
+# Word definition lines (word: or word::), possibly indented
+_KEY_RE = re.compile(r'^\s*([a-z:]+):\s*$', re.MULTILINE)
+
 def extract_words_from_pos_file(pos_file_path):
     """Extract words from cover_POS.txt"""
     words = set()
@@ -27,50 +44,83 @@ def extract_words_from_pos_file(pos_file_path):
                     words.add(word)
     return words
 
-def extract_words_from_yaml(yaml_file_path):
-    """Extract words from cover.yaml and check for duplicates"""
-    words = []
-    word_set = set()
-    duplicates = []
-    
-    # Read raw file to extract keys (handles YAML boolean keys and special chars like "re::")
+def load_cover(yaml_file_path):
+    """
+    Read cover.yaml once.
+    Returns (word_keys, data): word keys in file order, taken from the raw
+    text (handles YAML boolean keys and special chars like "re::"), and the
+    parsed YAML data.
+    """
     with open(yaml_file_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
     # Match lines that are word definitions (word: or word::)
-    # Pattern matches: word: or word:: at start of line (possibly with leading whitespace)
-    pattern = r'^(\s*)([a-z:]+):\s*$'
+    word_keys = [match.group(1) for match in _KEY_RE.finditer(content)]
     
-    for match in re.finditer(pattern, content, re.MULTILINE):
-        word = match.group(2)
-        words.append(word)
-        
+    data = yaml.load(content, Loader=_Loader)
+    
+    return word_keys, data
+
+def file_stamp(*paths):
+    """(path, mtime, size) for each path, used to tell whether a cache is stale"""
+    stamp = []
+    for path in paths:
+        stat = path.stat()
+        stamp.append((str(path.resolve()), stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+def load_inputs(pos_file, yaml_file, use_cache=True):
+    """
+    Parse cover_POS.txt and cover.yaml.
+    Returns (reference_words, yaml_words, yaml_data). With use_cache, results
+    are pickled to CACHE_DIR and reused while the input files (and this
+    script) are unchanged.
+    """
+    stamp = file_stamp(pos_file, yaml_file, Path(__file__))
+    paths_key = hashlib.blake2b(repr([p for p, _, _ in stamp]).encode(), digest_size=16)
+    cache_file = CACHE_DIR / f'verify-{paths_key.hexdigest()}.pkl'
+    
+    if use_cache:
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_stamp, inputs = pickle.load(f)
+            if cached_stamp == stamp:
+                return inputs
+        except Exception:  # missing or unreadable cache: parse the files
+            pass
+    
+    inputs = (extract_words_from_pos_file(pos_file),) + load_cover(yaml_file)
+    
+    if use_cache:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((stamp, inputs), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"WARNING: could not write cache {cache_file}: {e}", file=sys.stderr)
+    
+    return inputs
+
+def check_duplicates(word_keys):
+    """Collect the unique words in cover.yaml and any duplicates"""
+    word_set = set()
+    duplicates = []
+    
+    for word in word_keys:
         if word in word_set:
             duplicates.append(word)
         else:
             word_set.add(word)
     
-    return words, word_set, duplicates
+    return word_set, duplicates
 
-def check_weights_sum_to_one(yaml_file_path):
+def check_weights(word_keys, data):
     """Check that all weights for each word sum to 1.0"""
     words_with_invalid_sums = []
     tolerance = 0.0001
     
-    # Read raw file to get all word keys
-    with open(yaml_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract all word keys from raw file
-    word_keys = []
-    pattern = r'^(\s*)([a-z:]+):\s*$'
-    for match in re.finditer(pattern, content, re.MULTILINE):
-        word_keys.append(match.group(2))
-    
-    # Load YAML data
-    with open(yaml_file_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
-    
     if data is None:
         return {}, []
     
@@ -88,13 +138,18 @@ def check_weights_sum_to_one(yaml_file_path):
         word_weights[word] = weights
         
         # Check if weights sum to 1.0
-        total = sum(weights.values())
+        total = fsum(weights.values())
         if abs(total - 1.0) > tolerance:
             words_with_invalid_sums.append((word, total))
     
     return word_weights, words_with_invalid_sums
 
 def main():
+    parser = argparse.ArgumentParser(description='Verify cover.yaml against cover_POS.txt')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Always re-parse the input files instead of using {CACHE_DIR}')
+    args = parser.parse_args()
+    
     script_dir = Path(__file__).parent
     pos_file = script_dir / 'cover_POS.txt'
     yaml_file = script_dir / 'cover.yaml'
@@ -108,11 +163,12 @@ def main():
         sys.exit(1)
     
     print("Extracting words from cover_POS.txt...")
-    reference_words = extract_words_from_pos_file(pos_file)
+    reference_words, yaml_words, yaml_data = load_inputs(pos_file, yaml_file,
+                                                         use_cache=not args.no_cache)
     print(f"Found {len(reference_words)} words in reference file")
     
     print("\nExtracting words from cover.yaml...")
-    yaml_words, yaml_word_set, duplicates = extract_words_from_yaml(yaml_file)
+    yaml_word_set, duplicates = check_duplicates(yaml_words)
     print(f"Found {len(yaml_words)} word entries in cover.yaml")
     print(f"Found {len(yaml_word_set)} unique words in cover.yaml")
     
@@ -120,8 +176,9 @@ def main():
     print("\n" + "="*60)
     if duplicates:
         print(f"ERROR: Found {len(duplicates)} duplicate words in cover.yaml:")
+        counts = Counter(yaml_words)
         for dup in sorted(set(duplicates)):
-            count = yaml_words.count(dup)
+            count = counts[dup]
             print(f"  - '{dup}' appears {count} times")
         print("="*60)
         sys.exit(1)
@@ -152,7 +209,7 @@ def main():
     # Check that weights sum to 1.0
     print("\n" + "="*60)
     print("Checking that weights sum to 1.0 for each word...")
-    word_weights, words_with_invalid_sums = check_weights_sum_to_one(yaml_file)
+    word_weights, words_with_invalid_sums = check_weights(yaml_words, yaml_data)
     
     if words_with_invalid_sums:
         print(f"ERROR: Found {len(words_with_invalid_sums)} words where weights don't sum to 1.0:")
@@ -7,102 +7,110 @@ Script to verify that:
 """
 
 import sys
-import re
-import yaml
+import functools
+import py_compile
+from collections import Counter
+from math import fsum
 from pathlib import Path
 
+from build_payload_py import (
+    load_payload_module, load_payload_yaml, payload_module_path, write_payload_module, yaml_stamp,
+)
+
 def extract_words_from_pos_file(pos_file_path):
     """Extract words from english_bip39_POS.txt"""
-    words = set()
-    with open(pos_file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:  # Skip empty lines
-                continue
-            # Format: word|POS1,POS2,...
-            parts = line.split('|')
-            if parts:
-                word = parts[0].strip()
-                if word:
-                    words.add(word)
+    with open(pos_file_path, 'rb') as f:
+        content = f.read().decode('utf-8')
+    # Same line endings as text mode: \n, \r\n and \r
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    
+    # Format: word|POS1,POS2,...
+    # One set comprehension over the whole file instead of a loop with
+    # separate strip/split/strip calls and emptiness checks per line
+    words = {line.partition('|')[0].strip() for line in content.split('\n')}
+    words.discard('')  # Empty lines
     return words
 
-def extract_words_from_yaml(yaml_file_path):
-    """Extract words from payload.yaml and check for duplicates"""
-    words = []
-    word_set = set()
+@functools.lru_cache(maxsize=None)
+def _load(path_str, mtime_ns, size):
+    """
+    Load a payload YAML file as (word_keys, data), memoized on the file's
+    path, mtime and size so repeated verification in one process loads it once.
+    word_keys lists the word keys in file order, duplicates included; data is
+    the parsed YAML. Callers must not modify either.
+    Both come from the generated payload_data.py (see build_payload_py.py),
+    which is rebuilt first unless it was generated from this exact mtime and
+    size of the YAML file.
+    """
+    stamp = (mtime_ns, size)
+    module_path = payload_module_path(path_str)
+    
+    try:
+        loaded = load_payload_module(path_str, stamp)
+        if loaded is not None:
+            return loaded
+    except Exception as e:
+        print(f"Warning: could not load {module_path}, rebuilding it: {e}", file=sys.stderr)
+    
+    words, data = load_payload_yaml(path_str)
+    try:
+        write_payload_module(words, data, stamp, module_path)
+    except (OSError, py_compile.PyCompileError) as e:
+        print(f"Warning: could not write {module_path}: {e}", file=sys.stderr)
+    return words, data
+
+def _load_payload(yaml_file_path):
+    """Load payload.yaml as (word_keys, data) through the _load cache"""
+    return _load(str(yaml_file_path), *yaml_stamp(yaml_file_path))
+
+def scan_yaml(yaml_file_path):
+    """
+    Extract words from payload.yaml and check for duplicates.
+    Returns (words, word_set, duplicates, data), where data is the loaded
+    payload for check_weights_sum_to_one.
+    """
+    word_keys, data = _load_payload(yaml_file_path)
+    if not isinstance(data, dict):
+        data = {}
+    
+    words = list(word_keys)
+    word_set = set(words)
     duplicates = []
-    
-    # Read raw file to extract keys (handles YAML boolean keys like false, true, off)
-    with open(yaml_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Use regex to find word keys (word: at start of line, possibly indented)
-    import re
-    pattern = r'^(\s*)([a-z]+):\s*$'
-    for match in re.finditer(pattern, content, re.MULTILINE):
-        word = match.group(2)
-        words.append(word)
-        
-        if word in word_set:
-            duplicates.append(word)
-        else:
-            word_set.add(word)
-    
-    return words, word_set, duplicates
+    # Building the set in C is cheap; only walk the list when it shows duplicates
+    if len(word_set) != len(words):
+        seen = set()
+        for word in words:
+            if word in seen:
+                duplicates.append(word)
+            else:
+                seen.add(word)
+    
+    return words, word_set, duplicates, data
 
-def check_weights_sum_to_one(yaml_file_path):
+def check_weights_sum_to_one(words, data):
     """Check that all weights for each word sum to 1.0"""
+    word_weights = {}
     words_with_invalid_sums = []
     tolerance = 0.0001  # Allow small floating point differences
     
-    # Load YAML data
-    with open(yaml_file_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
-    
-    if data is None:
-        return {}, []
-    
-    # Read raw file to get all word keys (handles YAML boolean keys like false, true, off)
-    with open(yaml_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract all word keys from raw file
-    word_keys = []
-    pattern = r'^(\s*)([a-z]+):\s*$'
-    for match in re.finditer(pattern, content, re.MULTILINE):
-        word_keys.append(match.group(2))
-    
-    word_weights = {}
-    for word in word_keys:
-        # Get data, handling boolean keys specially
-        # YAML parses 'false', 'off' as False, 'true' as True, 'on' as True
-        pos_weights = None
-        if word == 'false':
-            pos_weights = data.get(False)
-        elif word == 'true':
-            pos_weights = data.get(True)
-        elif word == 'off':
-            # 'off' is parsed as False in YAML
-            pos_weights = data.get(False)
-        elif word == 'on':
-            # 'on' is parsed as True in YAML
-            pos_weights = data.get(True)
-        else:
-            pos_weights = data.get(word)
+    for word in words:
+        pos_weights = data.get(word)
         
         if pos_weights is None:
             continue
         
-        # Convert all values to float (in case they're stored as strings)
-        weights = {}
-        for pos, weight in pos_weights.items():
-            weights[pos] = float(weight)
+        # The loader already returns numbers; only convert to float when some
+        # weights are stored as strings
+        try:
+            total = fsum(pos_weights.values())
+        except TypeError:
+            pos_weights = {pos: float(weight) for pos, weight in pos_weights.items()}
+            total = fsum(pos_weights.values())
         
-        word_weights[word] = weights
+        word_weights[word] = pos_weights
         
         # Check if weights sum to 1.0
-        total = sum(weights.values())
         if abs(total - 1.0) > tolerance:
             words_with_invalid_sums.append((word, total))
     
@@ -126,7 +134,7 @@ def main():
     print(f"Found {len(reference_words)} words in reference file")
     
     print("\nExtracting words from payload.yaml...")
-    yaml_words, yaml_word_set, duplicates = extract_words_from_yaml(yaml_file)
+    yaml_words, yaml_word_set, duplicates, payload = scan_yaml(yaml_file)
     print(f"Found {len(yaml_words)} word entries in payload.yaml")
     print(f"Found {len(yaml_word_set)} unique words in payload.yaml")
     
@@ -134,9 +142,8 @@ def main():
     print("\n" + "="*60)
     if duplicates:
         print(f"ERROR: Found {len(duplicates)} duplicate words in payload.yaml:")
-        for dup in sorted(set(duplicates)):
-            count = yaml_words.count(dup)
-            print(f"  - '{dup}' appears {count} times")
+        counts = Counter(yaml_words)
+        print('\n'.join(f"  - '{dup}' appears {counts[dup]} times" for dup in sorted(set(duplicates))))
         print("="*60)
         sys.exit(1)
     else:
@@ -144,35 +151,40 @@ def main():
     
     # Check for missing words
     print("\n" + "="*60)
-    missing_words = reference_words - yaml_word_set
+    # Equal sets (the usual case) need neither difference
+    if reference_words == yaml_word_set:
+        missing_words = extra_words = frozenset()
+    else:
+        missing_words = reference_words - yaml_word_set
+        extra_words = yaml_word_set - reference_words
     if missing_words:
         print(f"ERROR: Found {len(missing_words)} words missing from payload.yaml:")
-        for word in sorted(missing_words):
-            print(f"  - '{word}'")
+        print('\n'.join(f"  - '{word}'" for word in sorted(missing_words)))
         print("="*60)
         sys.exit(1)
     else:
         print("✓ All words from english_bip39_POS.txt are present in payload.yaml")
     
     # Check for extra words (words in yaml but not in reference)
-    extra_words = yaml_word_set - reference_words
     if extra_words:
         print(f"\nWARNING: Found {len(extra_words)} words in payload.yaml not in reference file:")
-        for word in sorted(extra_words):
-            print(f"  - '{word}'")
+        print('\n'.join(f"  - '{word}'" for word in sorted(extra_words)))
     else:
         print("✓ No extra words found (all words in payload.yaml are in reference)")
     
     # Check that weights sum to 1.0
     print("\n" + "="*60)
     print("Checking that weights sum to 1.0 for each word...")
-    word_weights, words_with_invalid_sums = check_weights_sum_to_one(yaml_file)
+    # Only reached once the cheaper checks above have passed
+    word_weights, words_with_invalid_sums = check_weights_sum_to_one(yaml_words, payload)
     
     if words_with_invalid_sums:
         print(f"ERROR: Found {len(words_with_invalid_sums)} words where weights don't sum to 1.0:")
+        lines = []
         for word, total in sorted(words_with_invalid_sums):
-            weights_str = ', '.join([f"{pos}: {weight}" for pos, weight in sorted(word_weights[word].items())])
-            print(f"  - '{word}': sum = {total:.6f} (weights: {weights_str})")
+            weights_str = ', '.join([f"{pos}: {float(weight)}" for pos, weight in sorted(word_weights[word].items())])
+            lines.append(f"  - '{word}': sum = {total:.6f} (weights: {weights_str})")
+        print('\n'.join(lines))
         print("="*60)
         sys.exit(1)
     else: